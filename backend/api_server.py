@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory
 from flask_cors import CORS
 import sys
 import os
@@ -8,9 +8,11 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 try:
     from models.gnn_model import ModelManager
+    from models.streaming import StreamingScorer, open_source
 except ImportError:
     # Fallback/Debug if path issue persists
     from backend.models.gnn_model import ModelManager
+    from backend.models.streaming import StreamingScorer, open_source
 
 import datetime
 import random
@@ -36,6 +38,19 @@ def serve_static(path):
 # Initialize model
 model_manager = ModelManager('models/weights/model_weights.pth')
 
+# Streaming scorer: STREAM_SOURCE = 'stdin', 'file:<path>' or 'socket:<host>:<port>'
+# Run a single process (each process starts its own consumer) with threaded
+# workers, e.g. gunicorn -w 1 --threads 8, since every SSE client holds one
+STREAM_SOURCE = os.environ.get('STREAM_SOURCE')
+stream_scorer = None
+if STREAM_SOURCE:
+    stream_scorer = StreamingScorer(
+        model_manager,
+        k_hops=int(os.environ.get('STREAM_K_HOPS', 3)),
+        threshold=float(os.environ.get('STREAM_THRESHOLD', 0.85))
+    )
+    stream_scorer.start(open_source(STREAM_SOURCE))
+
 # ==========================================
 # RECOVERED DATA LOGIC
 # ==========================================
@@ -225,8 +240,29 @@ for m in range(0, 1440, 15):
 
 @app.route('/api/contagion', methods=['GET'])
 def get_contagion_data():
+    if stream_scorer is not None:
+        return jsonify(stream_scorer.get_contagion())
     return jsonify(MOCK_CONTAGION_DATA)
 
+STREAM_DISABLED = {'error': 'Streaming disabled: set STREAM_SOURCE to enable it'}
+
+@app.route('/api/stream/alerts', methods=['GET'])
+def stream_alerts():
+    if stream_scorer is None:
+        return jsonify(STREAM_DISABLED), 503
+    # Server-Sent-Events: 'alert' per threshold crossing, 'contagion' per updated bucket
+    return Response(
+        stream_scorer.event_stream(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/stream/stats', methods=['GET'])
+def get_stream_stats():
+    if stream_scorer is None:
+        return jsonify(STREAM_DISABLED), 503
+    return jsonify(stream_scorer.latency_report())
+
 @app.route('/api/risk-map', methods=['GET'])
 def get_risk_map():
     return jsonify(MOCK_RISK_DATA)
@@ -445,4 +481,5 @@ Generated by Smurfing Hunter Enterprise"""
     return jsonify({'sar': report})
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5000)
+    # The reloader would import this module twice and start a second stream consumer
+    app.run(debug=True, port=5000, use_reloader=not STREAM_SOURCE)
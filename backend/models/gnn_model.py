@@ -16,6 +16,8 @@ except ImportError:
 import numpy as np
 import os
 
+from .partitioning import partitioned_inference
+
 class SmurfingDetectorGNN(nn.Module):
     """
     Your GNN model for detecting smurfing patterns
@@ -27,11 +29,15 @@ class SmurfingDetectorGNN(nn.Module):
         self.conv3 = GCNConv(hidden_dim, hidden_dim)
         self.fc = nn.Linear(hidden_dim, num_classes)
         
-    def forward(self, x, edge_index, batch):
+    def embed(self, x, edge_index):
         # GCN layers
         x = torch.relu(self.conv1(x, edge_index))
         x = torch.relu(self.conv2(x, edge_index))
         x = torch.relu(self.conv3(x, edge_index))
+        return x
+
+    def forward(self, x, edge_index, batch):
+        x = self.embed(x, edge_index)
         
         # Global pooling
         # Handle batch=None for single graph inference
@@ -97,6 +103,75 @@ class ModelManager:
             'is_anomaly': predictions.cpu().numpy() == 1
         }
     
+    def predict_nodes(self, graph_data):
+        """
+        Run per-node (per-wallet) prediction on graph data
+
+        Unlike predict(), the node embeddings are classified directly
+        instead of being pooled into a single graph-level output.
+
+        Args:
+            graph_data: PyTorch Geometric Data object
+
+        Returns:
+            predictions: Dict with one prediction and score row per node
+        """
+        if self.mock_mode:
+            return self._mock_predict(graph_data)
+
+        with torch.no_grad():
+            graph_data = graph_data.to(self.device)
+            x = self.model.embed(graph_data.x, graph_data.edge_index)
+            probabilities = torch.softmax(self.model.fc(x), dim=1)
+            predictions = torch.argmax(probabilities, dim=1)
+
+        return {
+            'predictions': predictions.cpu().numpy(),
+            'probabilities': probabilities.cpu().numpy(),
+            'is_anomaly': predictions.cpu().numpy() == 1
+        }
+
+    def predict_partitioned(self, graph_data, max_memory_mb=512, return_embeddings=False):
+        """
+        Run per-node prediction partition by partition
+
+        For graphs whose full forward pass does not fit: each partition plus
+        its 3-hop halo runs on its own, so max_memory_mb bounds a single
+        partition's forward pass. The node features, the edge index (held
+        three times as CSR arrays) and the stitched outputs still sit in host
+        memory, which on CPU is the same RAM.
+
+        Args:
+            graph_data: PyTorch Geometric Data object (kept on the host)
+            max_memory_mb: Memory budget for a single partition's forward pass
+            return_embeddings: Also stitch the num_nodes x hidden_dim embeddings
+
+        Returns:
+            predictions: Dict like predict_nodes() plus the pooled
+            'graph_probabilities' of predict() and, if requested, 'embeddings'
+        """
+        if self.mock_mode:
+            result = self._mock_predict(graph_data)
+            result['graph_probabilities'] = result['probabilities'].mean(axis=0, keepdims=True)
+            if return_embeddings:
+                result['embeddings'] = self.get_node_embeddings(graph_data)
+            return result
+
+        result = partitioned_inference(
+            self.model, graph_data.x, graph_data.edge_index, max_memory_mb, self.device,
+            return_embeddings=return_embeddings
+        )
+        labels = np.argmax(result['probabilities'], axis=1)
+        predictions = {
+            'predictions': labels,
+            'probabilities': result['probabilities'],
+            'is_anomaly': labels == 1,
+            'graph_probabilities': result['graph_probabilities']
+        }
+        if return_embeddings:
+            predictions['embeddings'] = result['embeddings']
+        return predictions
+
     def _mock_predict(self, graph_data):
         """Fallback prediction for testing without trained model."""
         import random
@@ -136,8 +211,6 @@ class ModelManager:
 
         with torch.no_grad():
             graph_data = graph_data.to(self.device)
-            x = torch.relu(self.model.conv1(graph_data.x, graph_data.edge_index))
-            x = torch.relu(self.model.conv2(x, graph_data.edge_index))
-            embeddings = torch.relu(self.model.conv3(x, graph_data.edge_index))
+            embeddings = self.model.embed(graph_data.x, graph_data.edge_index)
         
         return embeddings.cpu().numpy()
@@ -0,0 +1,477 @@
+"""
+Streaming transaction scorer
+
+Consumes transactions as they arrive (file tail, TCP socket or stdin),
+re-scores only the wallets within k hops of each new edge and pushes
+threshold-crossing alerts plus rolling new-suspect-wallet counts to
+subscribers (served as Server-Sent-Events by api_server.py).
+"""
+import argparse
+import csv
+import datetime
+import json
+import queue
+import socket
+import sys
+import threading
+import time
+from collections import deque
+
+import torch
+try:
+    from torch_geometric.data import Data
+except ImportError:
+    # Mock Data class
+    class Data:
+        def __init__(self, x, edge_index):
+            self.x = x
+            self.edge_index = edge_index
+
+# Per-wallet features: [count, volume], as in preprocess_transaction_data
+NUM_FEATURES = 2
+
+
+# ==========================================
+# TRANSACTION SOURCES
+# ==========================================
+
+def tail_file(path, poll_interval=0.5, from_start=False, retry_interval=1.0):
+    """Yield lines appended to a file, like `tail -f`. Waits for the file to appear."""
+    warned = False
+    while True:
+        try:
+            f = open(path, 'r')
+            break
+        except OSError as e:
+            if not warned:
+                print(f"⚠️ Warning: Stream file {path} unavailable: {e}. Retrying...")
+                warned = True
+            time.sleep(retry_interval)
+
+    with f:
+        if not from_start:
+            f.seek(0, 2)
+        buffer = ''
+        while True:
+            chunk = f.readline()
+            if not chunk:
+                time.sleep(poll_interval)
+                continue
+            buffer += chunk
+            if not buffer.endswith('\n'):
+                continue  # Partial write, wait for the rest of the line
+            yield buffer
+            buffer = ''
+
+
+def read_socket(host, port, retry_interval=1.0):
+    """Yield newline-delimited lines from a TCP server, reconnecting on drop."""
+    while True:
+        try:
+            with socket.create_connection((host, port)) as conn:
+                for line in conn.makefile('r'):
+                    yield line
+        except OSError as e:
+            print(f"⚠️ Warning: Stream socket {host}:{port} unavailable: {e}. Retrying...")
+        time.sleep(retry_interval)
+
+
+def read_stdin():
+    """Yield lines from standard input until EOF."""
+    for line in sys.stdin:
+        yield line
+
+
+def open_source(spec):
+    """
+    Build a line source from a spec string
+
+    Args:
+        spec: 'stdin', 'file:<path>' or 'socket:<host>:<port>'
+    """
+    if spec == 'stdin':
+        return read_stdin()
+    kind, _, target = spec.partition(':')
+    if kind == 'file':
+        return tail_file(target)
+    if kind == 'socket':
+        host, _, port = target.rpartition(':')
+        return read_socket(host or 'localhost', int(port))
+    raise ValueError(f"Unknown stream source: {spec}")
+
+
+def parse_transaction(line):
+    """
+    Parse one JSON or CSV line into a transaction dictionary
+
+    Accepts the {'from', 'to', 'amount'} keys used by preprocessing.py as
+    well as the Source,Target,Amount columns of the CSV datasets.
+
+    Returns:
+        Dict with 'from', 'to' and 'amount', or None for blank lines,
+        CSV headers and malformed input
+    """
+    line = line.strip()
+    if not line:
+        return None
+
+    if line.startswith('{'):
+        try:
+            raw = json.loads(line)
+        except ValueError:
+            return None
+        src = raw.get('from', raw.get('Source'))
+        dst = raw.get('to', raw.get('Target'))
+        amount = raw.get('amount', raw.get('Amount', 0))
+    else:
+        fields = next(csv.reader([line]))
+        if len(fields) < 2:
+            return None
+        if fields[0].strip().lower() in ('source', 'from'):
+            return None  # Header row
+        src, dst = fields[0], fields[1]
+        amount = fields[2] if len(fields) > 2 else 0
+
+    try:
+        amount = float(amount)
+    except (TypeError, ValueError):
+        return None
+    if src is None or src == '' or dst is None or dst == '':
+        return None
+    # Numeric JSON ids and CSV ids name the same wallet
+    return {'from': str(src), 'to': str(dst), 'amount': amount}
+
+
+# ==========================================
+# DELTA RE-SCORING
+# ==========================================
+
+class StreamingScorer:
+    """
+    Incrementally maintained transaction graph with delta re-scoring
+
+    Each new edge only re-scores the wallets within `k_hops` outgoing
+    hops of its endpoints, the only outputs the edge can change. Those
+    wallets are scored on their `receptive_hops` incoming halo (the number
+    of GCN layers), so with k_hops >= receptive_hops the scores match a
+    full-graph pass over the same transactions.
+
+    Graph updates and re-scoring are serialized by `_write_lock`; `_lock`
+    only guards the scores and reporting state read by the API, so it is
+    never held while a subgraph is built or scored.
+    """
+    def __init__(self, model_manager, k_hops=3, receptive_hops=3, threshold=0.85,
+                 bucket_minutes=15, max_buckets=96, max_latencies=10000):
+        if not model_manager.mock_mode:
+            expected = getattr(model_manager.model.conv1, 'in_channels', NUM_FEATURES)
+            if expected != NUM_FEATURES:
+                raise ValueError(
+                    f"Streaming scorer builds {NUM_FEATURES} features per wallet ([count, volume]) "
+                    f"but the loaded model expects {expected}. Use weights trained on these "
+                    f"features or run without weights (MOCK MODE)."
+                )
+
+        self.model_manager = model_manager
+        self.k_hops = k_hops
+        self.receptive_hops = receptive_hops
+        self.threshold = threshold
+        self.bucket_seconds = bucket_minutes * 60
+
+        # Graph state, indexed by node id (same features as preprocess_transaction_data)
+        self.addresses = []
+        self.addr_to_idx = {}
+        self.node_stats = []   # [count, volume] per node
+        self.in_edges = []     # Source node ids per target, duplicates kept like edge_index
+        self.out_edges = []    # Target node ids per source, for the affected-wallet search
+        self.scores = []
+        self.suspects = set()
+
+        # Reporting state
+        self.contagion = deque(maxlen=max_buckets)  # [bucket ordinal, new suspect count]
+        self.latencies = deque(maxlen=max_latencies)
+        self.transactions_processed = 0
+        self.alerts_sent = 0
+        self.source_error = None
+
+        self._write_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._subscribers = []
+        self._subscribers_lock = threading.Lock()
+
+    def _node(self, address):
+        idx = self.addr_to_idx.get(address)
+        if idx is None:
+            idx = len(self.addresses)
+            self.addr_to_idx[address] = idx
+            self.addresses.append(address)
+            self.node_stats.append([0.0, 0.0])
+            self.in_edges.append([])
+            self.out_edges.append([])
+            self.scores.append(None)
+        return idx
+
+    @staticmethod
+    def _reach(seeds, hops, edges):
+        """Node ids within `hops` hops of the seeds along `edges` (inclusive)."""
+        visited = set(seeds)
+        frontier = list(visited)
+        for _ in range(hops):
+            next_frontier = []
+            for u in frontier:
+                for v in edges[u]:
+                    if v not in visited:
+                        visited.add(v)
+                        next_frontier.append(v)
+            if not next_frontier:
+                break
+            frontier = next_frontier
+        return visited
+
+    def _score(self, targets):
+        """
+        Score the target wallets on the smallest subgraph that reproduces
+        their full-graph output: their incoming `receptive_hops` halo plus
+        every edge into it, so GCN degree normalisation stays exact (the
+        same construction as GraphPartitioner.halo_subgraph).
+        """
+        nodes = list(targets)
+        local = {n: i for i, n in enumerate(nodes)}
+        frontier = list(nodes)
+        for _ in range(self.receptive_hops):
+            next_frontier = []
+            for v in frontier:
+                for u in self.in_edges[v]:
+                    if u not in local:
+                        local[u] = len(nodes)
+                        nodes.append(u)
+                        next_frontier.append(u)
+            if not next_frontier:
+                break
+            frontier = next_frontier
+
+        halo_size = len(nodes)
+        src_index, dst_index = [], []
+        for v in nodes[:halo_size]:
+            for u in self.in_edges[v]:
+                if u not in local:
+                    local[u] = len(nodes)
+                    nodes.append(u)
+                src_index.append(local[u])
+                dst_index.append(local[v])
+
+        x = torch.tensor([self.node_stats[n] for n in nodes], dtype=torch.float)
+        edge_index = torch.tensor([src_index, dst_index], dtype=torch.long)
+        result = self.model_manager.predict_nodes(Data(x=x, edge_index=edge_index))
+
+        probabilities = result['probabilities']
+        return {n: float(probabilities[local[n]][1]) for n in targets}
+
+    def process(self, tx, received_at=None):
+        """
+        Add one transaction to the graph, re-score its k-hop neighbourhood
+        and publish alerts for wallets crossing the threshold
+
+        Args:
+            tx: Dict with 'from', 'to' and 'amount'
+            received_at: time.perf_counter() value when the transaction was read
+
+        Returns:
+            alerts: List of alert payloads published for this transaction
+        """
+        if received_at is None:
+            received_at = time.perf_counter()
+
+        with self._write_lock:
+            src = self._node(tx['from'])
+            dst = self._node(tx['to'])
+            amt = float(tx.get('amount', 0))
+            self.node_stats[src][0] += 1
+            self.node_stats[src][1] -= amt  # Outgoing
+            self.node_stats[dst][0] += 1
+            self.node_stats[dst][1] += amt  # Incoming
+            self.in_edges[dst].append(src)
+            self.out_edges[src].append(dst)
+
+            # The edge changes src/dst features and dst's degree, which only
+            # reach wallets downstream of them
+            affected = self._reach((src, dst), self.k_hops, self.out_edges)
+            new_scores = self._score(affected)
+
+            with self._lock:
+                crossed = []
+                for n, score in new_scores.items():
+                    self.scores[n] = score
+                    if score >= self.threshold:
+                        if n not in self.suspects:
+                            self.suspects.add(n)
+                            crossed.append(n)
+                    else:
+                        # Dropping below the threshold re-arms the alert
+                        self.suspects.discard(n)
+
+                self.transactions_processed += 1
+                if crossed:
+                    bucket = self._record_new_suspects(len(crossed))
+                alerts = [{
+                    'address': self.addresses[n],
+                    'score': self.scores[n],
+                    'threshold': self.threshold,
+                    'transaction': tx,
+                    'rescored_wallets': len(affected),
+                } for n in crossed]
+
+        for alert in alerts:
+            alert['latency_ms'] = (time.perf_counter() - received_at) * 1000
+            alert['timestamp'] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self._publish('alert', alert)
+        if crossed:
+            self._publish('contagion', bucket)
+
+        latency = time.perf_counter() - received_at
+        with self._lock:
+            self.latencies.append(latency)
+            self.alerts_sent += len(alerts)
+        return alerts
+
+    def run(self, lines):
+        """Score every transaction read from a line source."""
+        try:
+            for line in lines:
+                received_at = time.perf_counter()
+                tx = parse_transaction(line)
+                if tx is None:
+                    continue
+                try:
+                    self.process(tx, received_at)
+                except Exception as e:
+                    print(f"⚠️ Error scoring transaction {tx}: {e}")
+        except Exception as e:
+            # Surfaced through latency_report() / /api/stream/stats
+            self.source_error = f"{type(e).__name__}: {e}"
+            print(f"⚠️ Error reading transaction stream: {e}. Stream stopped.")
+
+    def start(self, lines):
+        """Run the scorer on a background thread."""
+        thread = threading.Thread(target=self.run, args=(lines,), daemon=True)
+        thread.start()
+        return thread
+
+    # ==========================================
+    # CONTAGION SERIES & LATENCY REPORT
+    # ==========================================
+
+    def _advance_buckets(self, now):
+        ordinal = int(now // self.bucket_seconds)
+        if not self.contagion:
+            self.contagion.append([ordinal, 0])
+            return
+        # Fill quiet periods with zero counts so the series stays continuous
+        last = self.contagion[-1][0]
+        for missing in range(max(last + 1, ordinal - self.contagion.maxlen + 1), ordinal + 1):
+            self.contagion.append([missing, 0])
+
+    def _bucket_entry(self, bucket):
+        start = datetime.datetime.fromtimestamp(bucket[0] * self.bucket_seconds)
+        return {'time': f"{start.hour}:{start.minute:02d}", 'new_wallets': bucket[1]}
+
+    def _record_new_suspects(self, count):
+        self._advance_buckets(time.time())
+        self.contagion[-1][1] += count
+        return self._bucket_entry(self.contagion[-1])
+
+    def get_contagion(self):
+        """Rolling new-suspect-wallet counts, shaped like /api/contagion."""
+        with self._lock:
+            self._advance_buckets(time.time())
+            return [self._bucket_entry(bucket) for bucket in self.contagion]
+
+    def latency_report(self):
+        """End-to-end latency (read -> alerts published) per transaction."""
+        with self._lock:
+            samples = sorted(self.latencies)
+            report = {
+                'transactions': self.transactions_processed,
+                'wallets': len(self.addresses),
+                'suspects': len(self.suspects),
+                'alerts': self.alerts_sent,
+                'source_error': self.source_error,
+            }
+        if not samples:
+            return report
+
+        def percentile(p):
+            return samples[min(len(samples) - 1, int(p * len(samples)))] * 1000
+
+        report.update({
+            'samples': len(samples),
+            'mean_ms': sum(samples) / len(samples) * 1000,
+            'p50_ms': percentile(0.50),
+            'p95_ms': percentile(0.95),
+            'p99_ms': percentile(0.99),
+            'max_ms': samples[-1] * 1000,
+        })
+        return report
+
+    # ==========================================
+    # SUBSCRIBERS (SSE)
+    # ==========================================
+
+    def subscribe(self, max_queue=1000):
+        q = queue.Queue(maxsize=max_queue)
+        with self._subscribers_lock:
+            self._subscribers.append(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self._subscribers_lock:
+            if q in self._subscribers:
+                self._subscribers.remove(q)
+
+    def _publish(self, event, payload):
+        with self._subscribers_lock:
+            subscribers = list(self._subscribers)
+        for q in subscribers:
+            try:
+                q.put_nowait((event, payload))
+            except queue.Full:
+                pass  # Slow client: drop the event rather than stall the stream
+
+    def event_stream(self, heartbeat=15.0):
+        """Yield Server-Sent-Events for one subscriber until it disconnects."""
+        q = self.subscribe()
+        try:
+            yield f"event: contagion\ndata: {json.dumps(self.get_contagion())}\n\n"
+            while True:
+                try:
+                    event, payload = q.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+        finally:
+            self.unsubscribe(q)
+
+
+if __name__ == '__main__':
+    # Usage (from backend/): python -m models.streaming --source stdin < transactions.csv
+    from .gnn_model import ModelManager
+
+    parser = argparse.ArgumentParser(description='Stream transactions through the GNN scorer')
+    parser.add_argument('--source', default='stdin', help="'stdin', 'file:<path>' or 'socket:<host>:<port>'")
+    parser.add_argument('--weights', default='models/weights/model_weights.pth')
+    parser.add_argument('--threshold', type=float, default=0.85)
+    parser.add_argument('--k-hops', type=int, default=3)
+    args = parser.parse_args()
+
+    scorer = StreamingScorer(ModelManager(args.weights), k_hops=args.k_hops, threshold=args.threshold)
+    try:
+        for line in open_source(args.source):
+            received_at = time.perf_counter()
+            tx = parse_transaction(line)
+            if tx is None:
+                continue
+            for alert in scorer.process(tx, received_at):
+                print(json.dumps(alert))
+    except KeyboardInterrupt:
+        pass
+    print(json.dumps({'latency': scorer.latency_report()}), file=sys.stderr)
@@ -0,0 +1,5 @@
+import sys
+import os
+
+# Ensure backend directory is in sys.path so 'models' module can be found
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,116 @@
+import random
+
+import pytest
+
+torch = pytest.importorskip('torch')
+pytest.importorskip('torch_geometric')
+from torch_geometric.data import Data
+
+from models.gnn_model import ModelManager, SmurfingDetectorGNN
+from models.streaming import NUM_FEATURES, StreamingScorer, parse_transaction
+
+
+def make_manager(num_features):
+    manager = ModelManager('missing/model_weights.pth')  # No weights: starts in MOCK MODE
+    torch.manual_seed(0)
+    manager.model = SmurfingDetectorGNN(num_features=num_features).to(manager.device).eval()
+    manager.mock_mode = False
+    return manager
+
+
+def make_transactions(count=150, wallets=40, seed=0):
+    rng = random.Random(seed)
+    txs = []
+    for i in range(count):
+        kind = rng.random()
+        if kind < 0.3:
+            # Exchange-like hub on both sides of the flow
+            pair = ('hub', f"w{rng.randrange(wallets)}") if rng.random() < 0.5 else (f"w{rng.randrange(wallets)}", 'hub')
+        elif kind < 0.35:
+            w = f"w{rng.randrange(wallets)}"
+            pair = (w, w)  # Self-transfer
+        elif kind < 0.45 and txs:
+            pair = (txs[-1]['from'], txs[-1]['to'])  # Duplicate edge
+        else:
+            pair = (f"w{rng.randrange(wallets)}", f"w{rng.randrange(wallets)}")
+        txs.append({'from': pair[0], 'to': pair[1], 'amount': round(rng.uniform(0.1, 5.0), 3)})
+    return txs
+
+
+def full_graph_scores(manager, txs):
+    addr_to_idx = {}
+    stats = []
+    src_index, dst_index = [], []
+    for tx in txs:
+        for addr in (tx['from'], tx['to']):
+            if addr not in addr_to_idx:
+                addr_to_idx[addr] = len(stats)
+                stats.append([0.0, 0.0])
+        src, dst = addr_to_idx[tx['from']], addr_to_idx[tx['to']]
+        stats[src][0] += 1
+        stats[src][1] -= tx['amount']
+        stats[dst][0] += 1
+        stats[dst][1] += tx['amount']
+        src_index.append(src)
+        dst_index.append(dst)
+
+    data = Data(
+        x=torch.tensor(stats, dtype=torch.float),
+        edge_index=torch.tensor([src_index, dst_index], dtype=torch.long)
+    )
+    probabilities = manager.predict_nodes(data)['probabilities']
+    return {addr: float(probabilities[idx][1]) for addr, idx in addr_to_idx.items()}
+
+
+def test_delta_scores_match_full_graph():
+    manager = make_manager(NUM_FEATURES)
+    scorer = StreamingScorer(manager)
+    txs = make_transactions()
+
+    for i, tx in enumerate(txs):
+        scorer.process(tx)
+        expected = full_graph_scores(manager, txs[:i + 1])
+        for addr, idx in scorer.addr_to_idx.items():
+            assert scorer.scores[idx] == pytest.approx(expected[addr], abs=1e-5), (i, addr)
+
+
+def test_alerts_fire_once_per_crossing():
+    scorer = StreamingScorer(make_manager(NUM_FEATURES), threshold=0.0)
+    alerts = scorer.process({'from': 'a', 'to': 'b', 'amount': 1.0})
+    assert sorted(alert['address'] for alert in alerts) == ['a', 'b']
+    assert all(alert['latency_ms'] >= 0 for alert in alerts)
+
+    alerts = scorer.process({'from': 'a', 'to': 'b', 'amount': 1.0})
+    assert alerts == []
+    report = scorer.latency_report()
+    assert report['transactions'] == 2
+    assert report['alerts'] == 2
+    assert sum(bucket['new_wallets'] for bucket in scorer.get_contagion()) == 2
+
+
+def test_feature_mismatch_fails_at_construction():
+    with pytest.raises(ValueError):
+        StreamingScorer(make_manager(10))
+
+
+def test_source_error_is_reported():
+    def broken_source():
+        yield 'a,b,1.0\n'
+        raise OSError('stream closed')
+
+    scorer = StreamingScorer(make_manager(NUM_FEATURES))
+    scorer.run(broken_source())
+    report = scorer.latency_report()
+    assert report['transactions'] == 1
+    assert 'stream closed' in report['source_error']
+
+
+def test_parse_transaction():
+    assert parse_transaction('{"from": "a", "to": "b", "amount": 2}') == {'from': 'a', 'to': 'b', 'amount': 2.0}
+    assert parse_transaction('0xa,0xb,27.5,2025-11-02 13:34:31,ETH\n') == {'from': '0xa', 'to': '0xb', 'amount': 27.5}
+    assert parse_transaction('Source,Target,Amount,Timestamp,Token_Type') is None
+    assert parse_transaction('source,target') is None
+    assert parse_transaction('{"from": 0, "to": 123, "amount": 1}') == {'from': '0', 'to': '123', 'amount': 1.0}
+    assert parse_transaction('0,123,1') == {'from': '0', 'to': '123', 'amount': 1.0}
+    assert parse_transaction('{"from": "", "to": "b"}') is None
+    assert parse_transaction('\n') is None